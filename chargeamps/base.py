@@ -1,6 +1,8 @@
 """Base class for ChargeAmps API"""
 
 from abc import ABCMeta, abstractmethod
+from types import TracebackType
+from typing import Self
 
 from .models import (
     ChargePoint,
@@ -24,12 +26,23 @@ __all__ = [
 
 
 class ChargeAmpsClient(metaclass=ABCMeta):
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await self.shutdown()
+
     @abstractmethod
     async def shutdown(self) -> None:
         pass
 
     @abstractmethod
-    async def get_chargepoints(self) -> list[ChargePoint]:
+    async def get_chargepoints(self, cached: bool = False) -> list[ChargePoint]:
         """Get all owned chargepoints"""
         pass
 
@@ -2,85 +2,151 @@
 
 import argparse
 import asyncio
+import contextlib
 import json
 import logging
 import os
+import shlex
 import sys
 import uuid
+from collections.abc import AsyncIterator, Awaitable, Callable
 from datetime import datetime
+from typing import Any
 
 from aiohttp.client_exceptions import ClientResponseError
 from ciso8601 import parse_datetime
 from isoduration import parse_duration
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from . import __version__
 from .base import ChargeAmpsClient
 from .external import ChargeAmpsExternalClient, StartAuth
+from .report import PERIODS, EnergyAggregator
 
 logger = logging.getLogger(__name__)
 
 CONFIG_ENV = "CHARGEAMPS_CONFIG"
 
+report_locks: dict[str, asyncio.Lock] = {}
+
 
 async def get_chargepoint_id(client: ChargeAmpsClient, args: argparse.Namespace) -> str:
     if args.charge_point_id:
         return args.charge_point_id
-    chargepoints = await client.get_chargepoints()
+    chargepoints = await client.get_chargepoints(cached=True)
     return chargepoints[0].id
 
 
-async def command_list_chargepoints(client: ChargeAmpsClient, args: argparse.Namespace) -> None:
+async def stream_chargepoints(
+    client: ChargeAmpsClient,
+    args: argparse.Namespace,
+    func: Callable[[ChargeAmpsClient, argparse.Namespace, str], Awaitable[list]],
+) -> AsyncIterator[Any]:
+    """Run func for all owned chargepoints concurrently, yield rows as they complete.
+
+    A failing chargepoint yields an error row and does not stop the others.
+    """
+
+    async def run(charge_point_id: str) -> list:
+        try:
+            return await func(client, args, charge_point_id)
+        except Exception as exc:
+            return [{"chargePointId": charge_point_id, "error": str(exc) or exc.__class__.__name__}]
+
+    chargepoints = await client.get_chargepoints(cached=True)
+    tasks = [asyncio.create_task(run(cp.id)) for cp in chargepoints]
+    try:
+        for coro in asyncio.as_completed(tasks):
+            for row in await coro:
+                yield row
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def dumps_ndjson(obj: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+
+def write_ndjson(obj: Any) -> None:
+    sys.stdout.write(dumps_ndjson(obj) + "\n")
+    sys.stdout.flush()
+
+
+async def command_list_chargepoints(client: ChargeAmpsClient, args: argparse.Namespace) -> Any:
     res = []
     for cp in await client.get_chargepoints():
         res.append(cp.model_dump(by_alias=True))
-    print(json.dumps(res, indent=4))
+    return res
 
 
-async def command_get_chargepoint_status(
-    client: ChargeAmpsClient, args: argparse.Namespace
-) -> None:
-    charge_point_id = await get_chargepoint_id(client, args)
+async def chargepoint_status(
+    client: ChargeAmpsClient, args: argparse.Namespace, charge_point_id: str
+) -> list[dict]:
     cp = await client.get_chargepoint_status(charge_point_id)
     if args.connector_id:
-        for c in cp.connector_statuses:
-            if c.connector_id == args.connector_id:
-                print(json.dumps(c.model_dump(by_alias=True), indent=4))
+        return [
+            c.model_dump(by_alias=True)
+            for c in cp.connector_statuses
+            if c.connector_id == args.connector_id
+        ]
+    return [cp.model_dump(by_alias=True)]
+
+
+async def command_get_chargepoint_status(client: ChargeAmpsClient, args: argparse.Namespace) -> Any:
+    if args.all:
+        return stream_chargepoints(client, args, chargepoint_status)
+    charge_point_id = await get_chargepoint_id(client, args)
+    res = await chargepoint_status(client, args, charge_point_id)
+    return res[0] if res else None
+
+
+async def chargepoint_sessions(
+    client: ChargeAmpsClient, args: argparse.Namespace, charge_point_id: str
+) -> list[dict]:
+    if args.duration is not None:
+        start_time = datetime.utcnow() - parse_duration(args.duration)
+        end_time = None
     else:
-        print(json.dumps(cp.model_dump(by_alias=True), indent=4))
+        start_time = parse_datetime(args.start_time) if args.start_time else None
+        end_time = parse_datetime(args.end_time) if args.end_time else None
+    res = []
+    for session in await client.get_all_chargingsessions(charge_point_id, start_time, end_time):
+        if args.connector_id is None or args.connector_id == session.connector_id:
+            res.append(session.model_dump(by_alias=True))
+    return sorted(res, key=lambda i: i["id"])
 
 
 async def command_get_chargepoint_sessions(
     client: ChargeAmpsClient, args: argparse.Namespace
-) -> None:
+) -> Any:
+    if args.all:
+        return stream_chargepoints(client, args, chargepoint_sessions)
     charge_point_id = await get_chargepoint_id(client, args)
     if args.session:
         session = await client.get_chargingsession(charge_point_id, args.session)
-    else:
-        if args.duration is not None:
-            start_time = datetime.utcnow() - parse_duration(args.duration)
-            end_time = None
-        else:
-            start_time = parse_datetime(args.start_time) if args.start_time else None
-            end_time = parse_datetime(args.end_time) if args.end_time else None
-        res = []
-        for session in await client.get_all_chargingsessions(charge_point_id, start_time, end_time):
-            if args.connector_id is None or args.connector_id == session.connector_id:
-                res.append(session.model_dump(by_alias=True))
-        res = sorted(res, key=lambda i: i["id"])
-        print(json.dumps(res, indent=4))
+        return session.model_dump(by_alias=True)
+    return await chargepoint_sessions(client, args, charge_point_id)
 
 
 async def command_get_chargepoint_settings(
     client: ChargeAmpsClient, args: argparse.Namespace
-) -> None:
+) -> Any:
     charge_point_id = await get_chargepoint_id(client, args)
     settings = await client.get_chargepoint_settings(charge_point_id)
-    print(json.dumps(settings.model_dump(by_alias=True), indent=4))
+    return settings.model_dump(by_alias=True)
 
 
 async def command_set_chargepoint_settings(
     client: ChargeAmpsClient, args: argparse.Namespace
-) -> None:
+) -> Any:
     charge_point_id = await get_chargepoint_id(client, args)
     settings = await client.get_chargepoint_settings(charge_point_id)
     if args.dimmer:
@@ -89,28 +155,34 @@ async def command_set_chargepoint_settings(
         settings.down_light = args.downlight
     await client.set_chargepoint_settings(settings)
     settings = await client.get_chargepoint_settings(charge_point_id)
-    print(json.dumps(settings.model_dump(by_alias=True), indent=4))
+    return settings.model_dump(by_alias=True)
 
 
-async def command_get_connector_settings(
-    client: ChargeAmpsClient, args: argparse.Namespace
-) -> None:
-    charge_point_id = await get_chargepoint_id(client, args)
+async def connector_settings(
+    client: ChargeAmpsClient, args: argparse.Namespace, charge_point_id: str
+) -> list[dict]:
     if args.connector_id:
         connector_ids = [args.connector_id]
     else:
         cp = await client.get_chargepoint_status(charge_point_id)
         connector_ids = [c.connector_id for c in cp.connector_statuses]
-    res = []
-    for connector_id in connector_ids:
-        settings = await client.get_chargepoint_connector_settings(charge_point_id, connector_id)
-        res.append(settings.model_dump(by_alias=True))
-    print(json.dumps(res, indent=4))
+    res = await asyncio.gather(
+        *(
+            client.get_chargepoint_connector_settings(charge_point_id, connector_id)
+            for connector_id in connector_ids
+        )
+    )
+    return [settings.model_dump(by_alias=True) for settings in res]
 
 
-async def command_set_connector_settings(
-    client: ChargeAmpsClient, args: argparse.Namespace
-) -> None:
+async def command_get_connector_settings(client: ChargeAmpsClient, args: argparse.Namespace) -> Any:
+    if args.all:
+        return stream_chargepoints(client, args, connector_settings)
+    charge_point_id = await get_chargepoint_id(client, args)
+    return await connector_settings(client, args, charge_point_id)
+
+
+async def command_set_connector_settings(client: ChargeAmpsClient, args: argparse.Namespace) -> Any:
     charge_point_id = await get_chargepoint_id(client, args)
     connector_id = args.connector_id
     settings = await client.get_chargepoint_connector_settings(charge_point_id, connector_id)
@@ -124,7 +196,7 @@ async def command_set_connector_settings(
         settings.cable_lock = args.cable_lock
     await client.set_chargepoint_connector_settings(settings)
     settings = await client.get_chargepoint_connector_settings(charge_point_id, connector_id)
-    print(json.dumps(settings.model_dump(by_alias=True), indent=4))
+    return settings.model_dump(by_alias=True)
 
 
 async def command_remote_start(client: ChargeAmpsClient, args: argparse.Namespace) -> None:
@@ -161,6 +233,17 @@ def add_arg_chargepoint(parser, required=False):
     )
 
 
+def add_arg_chargepoint_or_all(parser) -> None:
+    group = parser.add_mutually_exclusive_group()
+    add_arg_chargepoint(group)
+    group.add_argument(
+        "--all",
+        dest="all",
+        action="store_true",
+        help="All owned chargepoints (output NDJSON)",
+    )
+
+
 def add_arg_connector(parser, required=False) -> None:
     parser.add_argument(
         "--connector",
@@ -172,10 +255,141 @@ def add_arg_connector(parser, required=False) -> None:
     )
 
 
-async def main_loop() -> None:
-    """Main function"""
-
-    parser = argparse.ArgumentParser(description=f"Chargeamps Client v{__version__}")
+async def command_batch(client: ChargeAmpsClient, args: argparse.Namespace) -> None:
+    """Run commands line by line against one client, writing NDJSON results.
+
+    Lines are dispatched as soon as they are read. Lines addressing the same
+    chargepoint (explicitly or the default one) run in input order. Lines
+    for all chargepoints (--all, or report without --chargepoint) run after
+    all earlier lines, and all later lines run after them. All other lines
+    run concurrently.
+    """
+    parser = build_parser(BatchArgumentParser)
+    loop = asyncio.get_running_loop()
+    previous: dict[str, asyncio.Task] = {}
+    barrier: asyncio.Task | None = None
+    tasks: list[asyncio.Task] = []
+
+    async def run_line(
+        lineno: int, line: str, line_args: argparse.Namespace, after: list[asyncio.Task]
+    ) -> None:
+        if after:
+            await asyncio.wait(after)
+        row: dict[str, Any] = {"line": lineno, "command": line}
+        try:
+            res = await line_args.func(client, line_args)
+            if isinstance(res, AsyncIterator):
+                async for item in res:
+                    write_ndjson({**row, "result": item})
+                return
+            row["result"] = res
+        except Exception as exc:
+            row["error"] = str(exc) or exc.__class__.__name__
+        write_ndjson(row)
+
+    with open(args.file) if args.file else contextlib.nullcontext(sys.stdin) as input_file:
+        lineno = 0
+        while line := await loop.run_in_executor(None, input_file.readline):
+            lineno += 1
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                line_args = parse_args(parser, shlex.split(line))
+            except ValueError as exc:
+                write_ndjson({"line": lineno, "command": line, "error": str(exc)})
+                continue
+            if getattr(line_args, "func", command_batch) is command_batch:
+                write_ndjson({"line": lineno, "command": line, "error": "Invalid command"})
+                continue
+            if getattr(line_args, "all", False) or (
+                line_args.func is command_report and not line_args.charge_point_id
+            ):
+                task = asyncio.create_task(run_line(lineno, line, line_args, list(tasks)))
+                barrier = task
+                previous = {}
+            elif hasattr(line_args, "charge_point_id"):
+                try:
+                    key = await get_chargepoint_id(client, line_args)
+                except Exception as exc:
+                    write_ndjson(
+                        {
+                            "line": lineno,
+                            "command": line,
+                            "error": str(exc) or exc.__class__.__name__,
+                        }
+                    )
+                    continue
+                after = previous.get(key, barrier)
+                task = asyncio.create_task(
+                    run_line(lineno, line, line_args, [after] if after else [])
+                )
+                previous[key] = task
+            else:
+                task = asyncio.create_task(
+                    run_line(lineno, line, line_args, [barrier] if barrier else [])
+                )
+            tasks.append(task)
+    await asyncio.gather(*tasks)
+
+
+async def command_report(client: ChargeAmpsClient, args: argparse.Namespace) -> Any:
+    # reports sharing a state file (e.g. in batch mode) must not overwrite each other
+    lock = report_locks.setdefault(os.path.realpath(args.state), asyncio.Lock())
+    async with lock:
+        return await report(client, args)
+
+
+async def report(client: ChargeAmpsClient, args: argparse.Namespace) -> Any:
+    aggregator = EnergyAggregator.load(args.state)
+    if args.sync:
+        if args.charge_point_id:
+            charge_point_ids = [args.charge_point_id]
+        else:
+            charge_point_ids = [cp.id for cp in await client.get_chargepoints(cached=True)]
+        res = await asyncio.gather(
+            *(
+                client.get_all_chargingsessions(
+                    charge_point_id, aggregator.sync_start(charge_point_id)
+                )
+                for charge_point_id in charge_point_ids
+            )
+        )
+        for sessions in res:
+            aggregator.update(sessions)
+        aggregator.save(args.state)
+    return aggregator.report(args.period, args.charge_point_id, args.connector_id)
+
+
+def parse_args(
+    parser: argparse.ArgumentParser, argv: list[str] | None = None
+) -> argparse.Namespace:
+    args = parser.parse_args(argv)
+    if getattr(args, "all", False) and getattr(args, "session", None):
+        parser.error("argument --all: not allowed with argument --session")
+    return args
+
+
+class BatchArgumentParser(argparse.ArgumentParser):
+    """Argument parser raising ValueError instead of printing help or errors"""
+
+    def print_help(self, file=None) -> None:
+        raise ValueError("Help is not available in batch mode")
+
+    def print_usage(self, file=None) -> None:
+        pass
+
+    def exit(self, status=0, message=None):
+        raise ValueError(message or "Invalid command")
+
+    def error(self, message):
+        raise ValueError(message)
+
+
+def build_parser(
+    parser_class: type[argparse.ArgumentParser] = argparse.ArgumentParser,
+) -> argparse.ArgumentParser:
+    parser = parser_class(description=f"Chargeamps Client v{__version__}")
     parser.add_argument(
         "--config",
         metavar="config",
@@ -191,12 +405,12 @@ async def main_loop() -> None:
 
     parser_status = subparsers.add_parser("status", help="Get chargepoint status")
     parser_status.set_defaults(func=command_get_chargepoint_status)
-    add_arg_chargepoint(parser_status)
+    add_arg_chargepoint_or_all(parser_status)
     add_arg_connector(parser_status)
 
     parser_sessions = subparsers.add_parser("sessions", help="Get chargepoint sessions")
     parser_sessions.set_defaults(func=command_get_chargepoint_sessions)
-    add_arg_chargepoint(parser_sessions)
+    add_arg_chargepoint_or_all(parser_sessions)
     add_arg_connector(parser_sessions)
     parser_sessions.add_argument(
         "--session",
@@ -262,7 +476,7 @@ async def main_loop() -> None:
         "get-connector", aliases=["get"], help="Get connector settings"
     )
     parser_get_connector.set_defaults(func=command_get_connector_settings)
-    add_arg_chargepoint(parser_get_connector)
+    add_arg_chargepoint_or_all(parser_get_connector)
     add_arg_connector(parser_get_connector)
 
     parser_set_connector = subparsers.add_parser(
@@ -325,7 +539,54 @@ async def main_loop() -> None:
     parser_reboot.set_defaults(func=command_reboot)
     add_arg_chargepoint(parser_reboot)
 
-    args = parser.parse_args()
+    parser_report = subparsers.add_parser("report", help="Energy consumption report")
+    parser_report.set_defaults(func=command_report)
+    add_arg_chargepoint(parser_report)
+    add_arg_connector(parser_report)
+    parser_report.add_argument(
+        "--state",
+        dest="state",
+        type=str,
+        metavar="filename",
+        required=True,
+        help="Rollup state file, updated with new sessions",
+    )
+    parser_report.add_argument(
+        "--period",
+        dest="period",
+        type=str,
+        choices=list(PERIODS),
+        default="day",
+        help="Report period",
+    )
+    parser_report.add_argument(
+        "--no-sync",
+        dest="sync",
+        action="store_false",
+        help="Report from state file only, do not fetch new sessions",
+    )
+
+    parser_batch = subparsers.add_parser(
+        "batch", help="Run commands from file or stdin, one per line, output NDJSON"
+    )
+    parser_batch.set_defaults(func=command_batch)
+    parser_batch.add_argument(
+        "--file",
+        dest="file",
+        type=str,
+        metavar="filename",
+        required=False,
+        help="Read commands from file instead of stdin",
+    )
+
+    return parser
+
+
+async def main_loop() -> None:
+    """Main function"""
+
+    parser = build_parser()
+    args = parse_args(parser)
 
     if args.debug:
         logging.basicConfig(level=logging.DEBUG)
@@ -337,25 +598,28 @@ async def main_loop() -> None:
     with open(args.config) as config_file:
         config = json.load(config_file)
 
-    client = ChargeAmpsExternalClient(
+    async with ChargeAmpsExternalClient(
         email=config["username"],
         password=config["password"],
         api_key=config["api_key"],
         api_base_url=config.get("api_base_url"),
-    )
-
-    try:
-        await args.func(client, args)
-    except ClientResponseError as exc:
-        sys.stderr.write(str(exc))
-    except (ValueError, AttributeError) as exc:
-        if args.debug:
-            raise exc
-        parser.print_help()
-        await client.shutdown()
-        sys.exit(0)
-
-    await client.shutdown()
+    ) as client:
+        try:
+            if args.func is command_batch or getattr(args, "all", False):
+                await client.warmup()
+            res = await args.func(client, args)
+            if isinstance(res, AsyncIterator):
+                async for row in res:
+                    write_ndjson(row)
+            elif res is not None:
+                print(json.dumps(res, indent=4))
+        except ClientResponseError as exc:
+            sys.stderr.write(str(exc))
+        except (ValueError, AttributeError) as exc:
+            if args.debug:
+                raise exc
+            parser.print_help()
+            sys.exit(0)
 
 
 def main() -> None:
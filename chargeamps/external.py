@@ -1,9 +1,12 @@
 """Charge-Amps External API Client"""
 
 import asyncio
+import hashlib
 import logging
 import time
+from collections.abc import Iterable
 from datetime import datetime
+from typing import TypeVar
 from urllib.parse import urljoin
 
 import httpx
@@ -16,12 +19,19 @@ from .models import (
     ChargePointSettings,
     ChargePointStatus,
     ChargingSession,
+    FrozenBaseSchema,
     StartAuth,
 )
+from .scheduler import Priority, RequestScheduler
 
 API_BASE_URL = "https://eapi.charge.space"
 API_VERSION = "v5"
 
+# fetch the session window instead when this many sessions are wanted for a chargepoint
+WINDOW_FETCH_THRESHOLD = 10
+
+ModelT = TypeVar("ModelT", bound=FrozenBaseSchema)
+
 
 class ChargeAmpsExternalClient(ChargeAmpsClient):
     def __init__(
@@ -31,14 +41,19 @@ class ChargeAmpsExternalClient(ChargeAmpsClient):
         api_key: str,
         api_base_url: str | None = None,
         httpx_client: httpx.AsyncClient | None = None,
+        scheduler: RequestScheduler | None = None,
+        fingerprint_cache: bool = False,
     ):
         self._logger = logging.getLogger(__name__).getChild(self.__class__.__name__)
         self._email = email
         self._password = password
         self._api_key = api_key
+        self._scheduler = scheduler or RequestScheduler()
         self._owns_client = httpx_client is None
         self._httpx_client = httpx_client or httpx.AsyncClient(
-            timeout=httpx.Timeout(connect=5.0, read=15.0, write=15.0, pool=5.0)
+            timeout=httpx.Timeout(connect=5.0, read=15.0, write=15.0, pool=5.0),
+            # spare connection for token requests, which are not scheduled
+            limits=httpx.Limits(max_connections=self._scheduler.max_concurrency + 1),
         )
         self._headers = {}
         self._base_url = api_base_url or API_BASE_URL
@@ -47,11 +62,34 @@ class ChargeAmpsExternalClient(ChargeAmpsClient):
         self._refresh_token = None
         self._token_skew = 30
         self._token_lock = asyncio.Lock()
+        self._fingerprint_cache = fingerprint_cache
+        self._fingerprints: dict[str, tuple[bytes, FrozenBaseSchema]] = {}
+        self._chargepoints: list[ChargePoint] | None = None
 
     async def shutdown(self) -> None:
         if self._owns_client:
             await self._httpx_client.aclose()
 
+    async def warmup(self, connections: int = 2) -> list[ChargePoint]:
+        """Authenticate, open pool connections and prefetch chargepoints in parallel.
+
+        Connections are opened within the NORMAL priority budget, which also
+        limits their number.
+        """
+        connections = min(connections, self._scheduler.budget(Priority.NORMAL))
+
+        async def connect() -> None:
+            async with self._scheduler.slot(Priority.NORMAL):
+                try:
+                    await self._httpx_client.head(self._base_url)
+                except httpx.RequestError as exc:
+                    self._logger.debug("Warmup connection failed: %s", exc)
+
+        chargepoints, *_ = await asyncio.gather(
+            self.get_chargepoints(), *(connect() for _ in range(connections - 1))
+        )
+        return chargepoints
+
     async def _ensure_token(self) -> None:
         async with self._token_lock:
             await self._exclusive_ensure_token()
@@ -113,7 +151,13 @@ class ChargeAmpsExternalClient(ChargeAmpsClient):
 
         self._headers["Authorization"] = f"Bearer {self._token}"
 
-    async def _httpx_retry(self, method, url, headers, **kwargs) -> httpx.Response:
+    async def _httpx_retry(
+        self, method, url, headers, priority: Priority = Priority.NORMAL, **kwargs
+    ) -> httpx.Response:
+        async with self._scheduler.slot(priority):
+            return await self._exclusive_httpx_retry(method, url, headers, **kwargs)
+
+    async def _exclusive_httpx_retry(self, method, url, headers, **kwargs) -> httpx.Response:
         try:
             headers = {**self._headers, **headers}
             response = await method(url, headers=headers, **kwargs)
@@ -130,31 +174,59 @@ class ChargeAmpsExternalClient(ChargeAmpsClient):
                 return response
             raise
 
-    async def _post(self, path, **kwargs) -> httpx.Response:
+    async def _post(self, path, priority: Priority = Priority.HIGH, **kwargs) -> httpx.Response:
         await self._ensure_token()
         url = urljoin(self._base_url, path)
         headers = kwargs.pop("headers", {})
-        return await self._httpx_retry(self._httpx_client.post, url, headers, **kwargs)
+        return await self._httpx_retry(
+            self._httpx_client.post, url, headers, priority=priority, **kwargs
+        )
 
-    async def _get(self, path, **kwargs) -> httpx.Response:
+    async def _get(self, path, priority: Priority = Priority.NORMAL, **kwargs) -> httpx.Response:
         await self._ensure_token()
         url = urljoin(self._base_url, path)
         headers = kwargs.pop("headers", {})
-        return await self._httpx_retry(self._httpx_client.get, url, headers, **kwargs)
+        return await self._httpx_retry(
+            self._httpx_client.get, url, headers, priority=priority, **kwargs
+        )
 
-    async def _put(self, path, **kwargs) -> httpx.Response:
+    async def _put(self, path, priority: Priority = Priority.HIGH, **kwargs) -> httpx.Response:
         await self._ensure_token()
         url = urljoin(self._base_url, path)
         headers = kwargs.pop("headers", {})
-        return await self._httpx_retry(self._httpx_client.put, url, headers, **kwargs)
+        return await self._httpx_retry(
+            self._httpx_client.put, url, headers, priority=priority, **kwargs
+        )
 
-    async def get_chargepoints(self) -> list[ChargePoint]:
-        """Get all owned chargepoints"""
+    async def _get_model(self, request_uri: str, model: type[ModelT]) -> tuple[ModelT, bool]:
+        """Get and validate model, return model and whether it changed since last get.
+
+        With the fingerprint cache enabled, a response body identical to the
+        previous one for the same resource returns the previously validated
+        (frozen) instance without parsing it again. Without the cache, the
+        model is always reported as changed.
+        """
+        response = await self._get(request_uri)
+        if not self._fingerprint_cache:
+            return model.model_validate(response.json()), True
+        fingerprint = hashlib.blake2b(response.content, digest_size=16).digest()
+        cached = self._fingerprints.get(request_uri)
+        if cached is not None and cached[0] == fingerprint and isinstance(cached[1], model):
+            return cached[1], False
+        res = model.model_validate_json(response.content)
+        self._fingerprints[request_uri] = (fingerprint, res)
+        return res, True
+
+    async def get_chargepoints(self, cached: bool = False) -> list[ChargePoint]:
+        """Get all owned chargepoints, optionally from previous result"""
+        if cached and self._chargepoints is not None:
+            return self._chargepoints
         request_uri = f"/api/{API_VERSION}/chargepoints/owned"
         response = await self._get(request_uri)
         res = []
         for chargepoint in response.json():
             res.append(ChargePoint.model_validate(chargepoint))
+        self._chargepoints = res
         return res
 
     async def get_all_chargingsessions(
@@ -170,34 +242,117 @@ class ChargeAmpsExternalClient(ChargeAmpsClient):
         if end_time:
             query_params["endTime"] = end_time.isoformat()
         request_uri = f"/api/{API_VERSION}/chargepoints/{charge_point_id}/chargingsessions"
-        response = await self._get(request_uri, params=query_params)
+        response = await self._get(request_uri, priority=Priority.LOW, params=query_params)
         res = []
         for session in response.json():
             res.append(ChargingSession.model_validate(session))
         return res
 
-    async def get_chargingsession(self, charge_point_id: str, session: int) -> ChargingSession:
+    async def get_chargingsession(
+        self, charge_point_id: str, session: int, priority: Priority = Priority.NORMAL
+    ) -> ChargingSession:
         """Get charging session"""
         request_uri = (
             f"/api/{API_VERSION}/chargepoints/{charge_point_id}/chargingsessions/{session}"
         )
-        response = await self._get(request_uri)
+        response = await self._get(request_uri, priority=priority)
         payload = response.json()
         return ChargingSession.model_validate(payload)
 
+    async def get_chargingsessions(
+        self,
+        sessions: Iterable[tuple[str, int]],
+        start_time: datetime | None = None,
+        end_time: datetime | None = None,
+        concurrency: int | None = None,
+        window_threshold: int = WINDOW_FETCH_THRESHOLD,
+    ) -> list[ChargingSession | Exception]:
+        """Get many charging sessions by (charge_point_id, session) concurrently.
+
+        Results (or the exception raised for that item) are returned in input
+        order. If a start_time/end_time window is given, chargepoints with at
+        least window_threshold distinct sessions requested have all sessions
+        in the window fetched in one request instead. Sessions not found in
+        the window, or all of them if the window fetch fails, are then fetched
+        individually, at LOW priority. At most concurrency of them run at
+        once; this defaults to, and is capped by, the scheduler LOW budget.
+        """
+        sessions = list(sessions)
+        wanted: dict[str, set[int]] = {}
+        for charge_point_id, session in sessions:
+            wanted.setdefault(charge_point_id, set()).add(session)
+
+        found: dict[tuple[str, int], ChargingSession | Exception] = {}
+
+        async def fetch_window(charge_point_id: str) -> None:
+            try:
+                window = await self.get_all_chargingsessions(charge_point_id, start_time, end_time)
+            except Exception as exc:
+                self._logger.warning("Window fetch failed for %s: %s", charge_point_id, exc)
+                return
+            for session in window:
+                if session.id in wanted[charge_point_id]:
+                    found[(charge_point_id, session.id)] = session
+
+        await asyncio.gather(
+            *(
+                fetch_window(charge_point_id)
+                for charge_point_id, ids in wanted.items()
+                if (start_time or end_time) and len(ids) >= window_threshold
+            )
+        )
+
+        semaphore = asyncio.Semaphore(concurrency or self._scheduler.budget(Priority.LOW))
+
+        async def fetch_session(charge_point_id: str, session: int) -> None:
+            async with semaphore:
+                try:
+                    found[(charge_point_id, session)] = await self.get_chargingsession(
+                        charge_point_id, session, priority=Priority.LOW
+                    )
+                except Exception as exc:
+                    found[(charge_point_id, session)] = exc
+
+        await asyncio.gather(
+            *(
+                fetch_session(charge_point_id, session)
+                for charge_point_id, ids in wanted.items()
+                for session in ids
+                if (charge_point_id, session) not in found
+            )
+        )
+
+        return [found[key] for key in sessions]
+
     async def get_chargepoint_status(self, charge_point_id: str) -> ChargePointStatus:
         """Get charge point status"""
+        status, _ = await self.poll_chargepoint_status(charge_point_id)
+        return status
+
+    async def poll_chargepoint_status(self, charge_point_id: str) -> tuple[ChargePointStatus, bool]:
+        """Get charge point status and whether it changed since last poll.
+
+        changed is only meaningful with fingerprint_cache=True, otherwise it is
+        always True.
+        """
         request_uri = f"/api/{API_VERSION}/chargepoints/{charge_point_id}/status"
-        response = await self._get(request_uri)
-        payload = response.json()
-        return ChargePointStatus.model_validate(payload)
+        return await self._get_model(request_uri, ChargePointStatus)
 
     async def get_chargepoint_settings(self, charge_point_id: str) -> ChargePointSettings:
         """Get chargepoint settings"""
+        settings, _ = await self.poll_chargepoint_settings(charge_point_id)
+        return settings
+
+    async def poll_chargepoint_settings(
+        self, charge_point_id: str
+    ) -> tuple[ChargePointSettings, bool]:
+        """Get chargepoint settings and whether they changed since last poll.
+
+        changed is only meaningful with fingerprint_cache=True, otherwise it is
+        always True.
+        """
         request_uri = f"/api/{API_VERSION}/chargepoints/{charge_point_id}/settings"
-        response = await self._get(request_uri)
-        payload = response.json()
-        return ChargePointSettings.model_validate(payload)
+        return await self._get_model(request_uri, ChargePointSettings)
 
     async def set_chargepoint_settings(self, settings: ChargePointSettings) -> None:
         """Set chargepoint settings"""
@@ -0,0 +1,195 @@
+"""Incremental energy aggregation over charging sessions"""
+
+import os
+from collections.abc import Iterable
+from datetime import UTC, datetime
+
+from pydantic import BaseModel
+
+from .models import ChargingSession
+
+PERIODS = {
+    "hour": "%Y-%m-%dT%H:00Z",
+    "day": "%Y-%m-%d",
+    "month": "%Y-%m",
+}
+
+
+class Rollup(BaseModel):
+    energy_kwh: float = 0.0
+    sessions: int = 0
+    duration_seconds: float = 0.0
+
+
+class SessionContribution(BaseModel):
+    charge_point_id: str
+    connector_id: int
+    start_time: datetime
+    energy_kwh: float
+    duration_seconds: float
+    open: bool
+
+
+class AggregatorState(BaseModel):
+    version: int = 1
+    sessions: dict[str, SessionContribution] = {}
+    rollups: dict[str, Rollup] = {}
+    watermarks: dict[str, datetime] = {}
+
+
+def _utc(timestamp: datetime) -> datetime:
+    if timestamp.tzinfo is None:
+        return timestamp.replace(tzinfo=UTC)
+    return timestamp.astimezone(UTC)
+
+
+def _rollup_key(period: str, bucket: str, charge_point_id: str, connector_id: int) -> str:
+    return f"{period}|{bucket}|{charge_point_id}|{connector_id}"
+
+
+class EnergyAggregator:
+    """Running hourly/daily/monthly rollups of charging sessions.
+
+    Each session is attributed to the buckets of its start time. The
+    contribution of every session that a later sync can fetch again (open
+    sessions and sessions starting at or after the sync start) is
+    remembered, so an updated session (e.g. one that was still open at the
+    previous sync) replaces its earlier contribution instead of being
+    counted twice. Older contributions are pruned, so the state size does
+    not grow with the total history.
+    """
+
+    def __init__(self, state: AggregatorState | None = None):
+        self._state = state or AggregatorState()
+
+    @classmethod
+    def load(cls, filename: str) -> "EnergyAggregator":
+        """Load aggregator state from file, start empty if file does not exist"""
+        try:
+            with open(filename) as input_file:
+                return cls(AggregatorState.model_validate_json(input_file.read()))
+        except FileNotFoundError:
+            return cls()
+
+    def save(self, filename: str) -> None:
+        """Save aggregator state to file"""
+        temp_filename = f"{filename}.tmp"
+        with open(temp_filename, "w") as output_file:
+            output_file.write(self._state.model_dump_json())
+        os.replace(temp_filename, filename)
+
+    def _apply(self, contribution: SessionContribution, sign: int) -> None:
+        for period, fmt in PERIODS.items():
+            key = _rollup_key(
+                period,
+                contribution.start_time.strftime(fmt),
+                contribution.charge_point_id,
+                contribution.connector_id,
+            )
+            rollup = self._state.rollups.setdefault(key, Rollup())
+            rollup.energy_kwh += sign * contribution.energy_kwh
+            rollup.sessions += sign
+            rollup.duration_seconds += sign * contribution.duration_seconds
+            if rollup.sessions == 0:
+                del self._state.rollups[key]
+
+    def update(self, sessions: Iterable[ChargingSession]) -> int:
+        """Add new or updated sessions, return number of sessions that changed rollups"""
+        changes = 0
+        cutoffs: dict[str, datetime | None] = {}
+        for session in sessions:
+            start_time = session.start_time or session.end_time
+            if start_time is None:
+                continue
+            start_time = _utc(start_time)
+            duration_seconds = (
+                (_utc(session.end_time) - start_time).total_seconds()
+                if session.end_time is not None
+                else 0.0
+            )
+            contribution = SessionContribution(
+                charge_point_id=session.charge_point_id,
+                connector_id=session.connector_id,
+                start_time=start_time,
+                energy_kwh=session.total_consumption_kwh,
+                duration_seconds=duration_seconds,
+                open=session.end_time is None,
+            )
+            if session.charge_point_id not in cutoffs:
+                cutoffs[session.charge_point_id] = self.sync_start(session.charge_point_id)
+            key = f"{session.charge_point_id}/{session.id}"
+            previous = self._state.sessions.get(key)
+            cutoff = cutoffs[session.charge_point_id]
+            if previous is None and cutoff is not None and start_time < cutoff:
+                # closed before the previous sync start, already counted and pruned
+                continue
+            watermark = self._state.watermarks.get(session.charge_point_id)
+            if watermark is None or start_time > watermark:
+                self._state.watermarks[session.charge_point_id] = start_time
+            if previous == contribution:
+                continue
+            if previous is not None:
+                self._apply(previous, -1)
+            self._apply(contribution, 1)
+            self._state.sessions[key] = contribution
+            changes += 1
+        for charge_point_id in cutoffs:
+            self._prune(charge_point_id)
+        return changes
+
+    def _prune(self, charge_point_id: str) -> None:
+        """Forget closed sessions that start before the next sync start"""
+        sync_start = self.sync_start(charge_point_id)
+        if sync_start is None:
+            return
+        for key, contribution in list(self._state.sessions.items()):
+            if (
+                contribution.charge_point_id == charge_point_id
+                and not contribution.open
+                and contribution.start_time < sync_start
+            ):
+                del self._state.sessions[key]
+
+    def sync_start(self, charge_point_id: str) -> datetime | None:
+        """Start time to fetch sessions from to bring chargepoint rollups up to date.
+
+        This is the start of the oldest still open session, or the start of
+        the latest session seen if all sessions are closed.
+        """
+        res = self._state.watermarks.get(charge_point_id)
+        for contribution in self._state.sessions.values():
+            if contribution.charge_point_id != charge_point_id:
+                continue
+            if contribution.open and (res is None or contribution.start_time < res):
+                res = contribution.start_time
+        return res
+
+    def report(
+        self,
+        period: str = "day",
+        charge_point_id: str | None = None,
+        connector_id: int | None = None,
+    ) -> list[dict]:
+        """Get rollups for period, optionally limited to chargepoint and connector"""
+        if period not in PERIODS:
+            raise ValueError(f"Unknown period: {period}")
+        res = []
+        for key, rollup in self._state.rollups.items():
+            key_period, bucket, key_charge_point_id, key_connector_id = key.split("|")
+            if key_period != period:
+                continue
+            if charge_point_id is not None and key_charge_point_id != charge_point_id:
+                continue
+            if connector_id is not None and int(key_connector_id) != connector_id:
+                continue
+            res.append(
+                {
+                    "period": bucket,
+                    "chargePointId": key_charge_point_id,
+                    "connectorId": int(key_connector_id),
+                    "totalConsumptionKwh": round(rollup.energy_kwh, 3),
+                    "sessions": rollup.sessions,
+                    "durationSeconds": rollup.duration_seconds,
+                }
+            )
+        return sorted(res, key=lambda i: (i["period"], i["chargePointId"], i["connectorId"]))
@@ -0,0 +1,58 @@
+"""Request scheduler for ChargeAmps API"""
+
+import asyncio
+from collections.abc import AsyncIterator, Mapping
+from contextlib import asynccontextmanager
+from enum import IntEnum
+
+
+class Priority(IntEnum):
+    """Request priority class"""
+
+    HIGH = 0  # control writes
+    NORMAL = 1  # interactive reads
+    LOW = 2  # bulk/historical reads
+
+
+DEFAULT_CONCURRENCY = {
+    Priority.HIGH: 4,
+    Priority.NORMAL: 16,
+    Priority.LOW: 4,
+}
+
+
+class RequestScheduler:
+    """Limit concurrent requests per priority class.
+
+    Each priority class has its own concurrency budget, so a saturated class
+    (e.g. a bulk export running at LOW) never delays requests in another class.
+
+    This only holds if the connection pool has room for max_concurrency
+    requests. A client created by ChargeAmpsExternalClient is sized for this,
+    but a httpx_client passed in (e.g. shared by Home Assistant) keeps its own
+    limits, and with a smaller pool HIGH requests may still queue behind
+    bulk reads there.
+    """
+
+    def __init__(self, concurrency: Mapping[Priority, int] | None = None):
+        budgets = {**DEFAULT_CONCURRENCY, **(concurrency or {})}
+        for priority, budget in budgets.items():
+            if budget < 1:
+                raise ValueError(f"Concurrency for {priority.name} must be positive")
+        self._budgets = budgets
+        self._semaphores = {priority: asyncio.Semaphore(n) for priority, n in budgets.items()}
+
+    @property
+    def max_concurrency(self) -> int:
+        """Total number of concurrent requests over all priority classes"""
+        return sum(self._budgets.values())
+
+    def budget(self, priority: Priority) -> int:
+        """Concurrency budget for priority class"""
+        return self._budgets[priority]
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority = Priority.NORMAL) -> AsyncIterator[None]:
+        """Wait for a free slot in priority class"""
+        async with self._semaphores[priority]:
+            yield
@@ -0,0 +1,189 @@
+"""Synchronous Charge-Amps External API Client"""
+
+import asyncio
+import threading
+from collections.abc import Callable, Coroutine, Iterable
+from datetime import datetime
+from types import TracebackType
+from typing import Any, TypeVar
+
+import httpx
+
+from .external import ChargeAmpsExternalClient
+from .models import (
+    ChargePoint,
+    ChargePointConnectorSettings,
+    ChargePointSettings,
+    ChargePointStatus,
+    ChargingSession,
+    StartAuth,
+)
+from .scheduler import RequestScheduler
+
+T = TypeVar("T")
+
+ClientCall = Callable[[ChargeAmpsExternalClient], Coroutine[Any, Any, T]]
+
+
+class ChargeAmpsSyncClient:
+    """Synchronous facade for ChargeAmpsExternalClient.
+
+    A single event loop runs in a background thread for the lifetime of the
+    facade, so the connection pool and token are reused across calls.
+    """
+
+    def __init__(
+        self,
+        email: str,
+        password: str,
+        api_key: str,
+        api_base_url: str | None = None,
+        httpx_client: httpx.AsyncClient | None = None,
+        scheduler: RequestScheduler | None = None,
+        fingerprint_cache: bool = False,
+    ):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name=self.__class__.__name__, daemon=True
+        )
+        self._thread.start()
+        self._closed = False
+
+        async def create_client() -> ChargeAmpsExternalClient:
+            return ChargeAmpsExternalClient(
+                email=email,
+                password=password,
+                api_key=api_key,
+                api_base_url=api_base_url,
+                httpx_client=httpx_client,
+                scheduler=scheduler,
+                fingerprint_cache=fingerprint_cache,
+            )
+
+        self._client = self._submit(create_client)
+
+    def __enter__(self) -> "ChargeAmpsSyncClient":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def _submit(self, coro_factory: Callable[[], Coroutine[Any, Any, T]]) -> T:
+        if self._closed:
+            raise RuntimeError("Client is closed")
+        return asyncio.run_coroutine_threadsafe(coro_factory(), self._loop).result()
+
+    def close(self) -> None:
+        """Shutdown client and stop event loop"""
+        if self._closed:
+            return
+        try:
+            self._submit(self._client.shutdown)
+        finally:
+            self._closed = True
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+
+    def run(self, call: ClientCall[T]) -> T:
+        """Run a single call against the async client"""
+        return self._submit(lambda: call(self._client))
+
+    def run_many(self, calls: Iterable[ClientCall[Any]], return_exceptions: bool = False) -> list:
+        """Run several calls concurrently, results are returned in call order"""
+
+        async def gather() -> list:
+            return await asyncio.gather(
+                *(call(self._client) for call in calls), return_exceptions=return_exceptions
+            )
+
+        return self._submit(gather)
+
+    def warmup(self, connections: int = 2) -> list[ChargePoint]:
+        """Authenticate, open pool connections and prefetch chargepoints in parallel"""
+        return self.run(lambda client: client.warmup(connections))
+
+    def get_chargepoints(self, cached: bool = False) -> list[ChargePoint]:
+        """Get all owned chargepoints, optionally from previous result"""
+        return self.run(lambda client: client.get_chargepoints(cached))
+
+    def get_all_chargingsessions(
+        self,
+        charge_point_id: str,
+        start_time: datetime | None = None,
+        end_time: datetime | None = None,
+    ) -> list[ChargingSession]:
+        """Get all charging sessions"""
+        return self.run(
+            lambda client: client.get_all_chargingsessions(charge_point_id, start_time, end_time)
+        )
+
+    def get_chargingsession(self, charge_point_id: str, session: int) -> ChargingSession:
+        """Get charging session"""
+        return self.run(lambda client: client.get_chargingsession(charge_point_id, session))
+
+    def get_chargingsessions(
+        self,
+        sessions: Iterable[tuple[str, int]],
+        start_time: datetime | None = None,
+        end_time: datetime | None = None,
+    ) -> list[ChargingSession | Exception]:
+        """Get many charging sessions by (charge_point_id, session) concurrently"""
+        return self.run(lambda client: client.get_chargingsessions(sessions, start_time, end_time))
+
+    def get_chargepoint_status(self, charge_point_id: str) -> ChargePointStatus:
+        """Get charge point status"""
+        return self.run(lambda client: client.get_chargepoint_status(charge_point_id))
+
+    def poll_chargepoint_status(self, charge_point_id: str) -> tuple[ChargePointStatus, bool]:
+        """Get charge point status and whether it changed since last poll.
+
+        changed is only meaningful with fingerprint_cache=True, otherwise it is
+        always True.
+        """
+        return self.run(lambda client: client.poll_chargepoint_status(charge_point_id))
+
+    def get_chargepoint_settings(self, charge_point_id: str) -> ChargePointSettings:
+        """Get chargepoint settings"""
+        return self.run(lambda client: client.get_chargepoint_settings(charge_point_id))
+
+    def poll_chargepoint_settings(self, charge_point_id: str) -> tuple[ChargePointSettings, bool]:
+        """Get chargepoint settings and whether they changed since last poll.
+
+        changed is only meaningful with fingerprint_cache=True, otherwise it is
+        always True.
+        """
+        return self.run(lambda client: client.poll_chargepoint_settings(charge_point_id))
+
+    def set_chargepoint_settings(self, settings: ChargePointSettings) -> None:
+        """Set chargepoint settings"""
+        self.run(lambda client: client.set_chargepoint_settings(settings))
+
+    def get_chargepoint_connector_settings(
+        self, charge_point_id: str, connector_id: int
+    ) -> ChargePointConnectorSettings:
+        """Get connector settings"""
+        return self.run(
+            lambda client: client.get_chargepoint_connector_settings(charge_point_id, connector_id)
+        )
+
+    def set_chargepoint_connector_settings(self, settings: ChargePointConnectorSettings) -> None:
+        """Set connector settings"""
+        self.run(lambda client: client.set_chargepoint_connector_settings(settings))
+
+    def remote_start(self, charge_point_id: str, connector_id: int, start_auth: StartAuth) -> None:
+        """Remote start chargepoint"""
+        self.run(lambda client: client.remote_start(charge_point_id, connector_id, start_auth))
+
+    def remote_stop(self, charge_point_id: str, connector_id: int) -> None:
+        """Remote stop chargepoint"""
+        self.run(lambda client: client.remote_stop(charge_point_id, connector_id))
+
+    def reboot(self, charge_point_id: str) -> None:
+        """Reboot chargepoint"""
+        self.run(lambda client: client.reboot(charge_point_id))
@@ -1,6 +1,53 @@
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime
+
+import httpx
+import jwt
 import pytest
 
+from chargeamps.cli import (
+    BatchArgumentParser,
+    build_parser,
+    command_batch,
+    command_get_connector_settings,
+    command_report,
+    parse_args,
+)
 from chargeamps.external import ChargeAmpsExternalClient
+from chargeamps.scheduler import Priority, RequestScheduler
+from chargeamps.sync import ChargeAmpsSyncClient
+
+CHARGE_POINT_ID = "cp1"
+
+
+def mock_token() -> str:
+    return jwt.encode({"exp": int(time.time()) + 3600}, "x" * 32, algorithm="HS256")
+
+
+def mock_httpx_client(handler) -> httpx.AsyncClient:
+    async def transport_handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/auth/login"):
+            return httpx.Response(200, json={"token": mock_token(), "refreshToken": "r"})
+        return await handler(request)
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(transport_handler))
+
+
+def mock_client(handler, client_class=ChargeAmpsExternalClient, **kwargs):
+    client = client_class(
+        email="user@example.com",
+        password="mekmitasdigoat",
+        api_key="xyzzy",
+        httpx_client=mock_httpx_client(handler),
+        **kwargs,
+    )
+    # hand the mock httpx client over, so shutdown() closes it
+    external_client = client._client if client_class is ChargeAmpsSyncClient else client
+    external_client._owns_client = True
+    return client
 
 
 @pytest.mark.asyncio
@@ -8,3 +55,371 @@ async def test_external_client():
     _ = ChargeAmpsExternalClient(
         email="user@example.com", password="mekmitasdigoat", api_key="xyzzy"
     )
+
+
+@pytest.mark.asyncio
+async def test_scheduler_budgets():
+    scheduler = RequestScheduler({Priority.LOW: 1})
+    assert scheduler.budget(Priority.LOW) == 1
+
+    async with scheduler.slot(Priority.LOW):
+        # LOW is saturated, HIGH must not wait
+        async with asyncio.timeout(1):
+            async with scheduler.slot(Priority.HIGH):
+                pass
+        with pytest.raises(TimeoutError):
+            async with asyncio.timeout(0.05):
+                async with scheduler.slot(Priority.LOW):
+                    pass
+
+    with pytest.raises(ValueError):
+        RequestScheduler({Priority.HIGH: 0})
+
+
+@pytest.mark.asyncio
+async def test_control_bypasses_bulk_reads():
+    release = asyncio.Event()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/chargingsessions"):
+            await release.wait()
+            return httpx.Response(200, json=[])
+        return httpx.Response(200)
+
+    async with mock_client(handler, scheduler=RequestScheduler({Priority.LOW: 1})) as client:
+        bulk = [
+            asyncio.create_task(client.get_all_chargingsessions(CHARGE_POINT_ID)) for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        async with asyncio.timeout(1):
+            await client.remote_stop(CHARGE_POINT_ID, 1)
+        release.set()
+        assert await asyncio.gather(*bulk) == [[], [], []]
+
+
+def test_sync_client():
+    async def handler(request: httpx.Request) -> httpx.Response:
+        charge_point_id = request.url.path.split("/")[-2]
+        return httpx.Response(
+            200, json={"id": charge_point_id, "status": "Online", "connectorStatuses": []}
+        )
+
+    with mock_client(handler, client_class=ChargeAmpsSyncClient) as client:
+        assert client.get_chargepoint_status("cp1").id == "cp1"
+        token = client._client._token
+        statuses = client.run_many(
+            [lambda c, cp=cp: c.get_chargepoint_status(cp) for cp in ("cp2", "cp3")]
+        )
+        assert [status.id for status in statuses] == ["cp2", "cp3"]
+        assert client._client._token == token
+
+    with pytest.raises(RuntimeError):
+        client.get_chargepoints()
+
+
+@pytest.mark.asyncio
+async def test_cli_batch(tmp_path, capsys):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        charge_point_id = request.url.path.split("/")[-2]
+        return httpx.Response(
+            200, json={"id": charge_point_id, "dimmer": "Off", "downLight": False}
+        )
+
+    commands = tmp_path / "commands.txt"
+    commands.write_text(
+        "get-chargepoint --chargepoint cp1\n# comment\nxyzzy\nget-chargepoint --chargepoint cp2\n"
+        "status --help\n"
+    )
+    async with mock_client(handler) as client:
+        await command_batch(client, argparse.Namespace(file=str(commands)))
+        rows = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        rows = sorted(rows, key=lambda row: row["line"])
+        assert [row["line"] for row in rows] == [1, 3, 4, 5]
+        assert rows[0]["result"]["id"] == "cp1"
+        assert "error" in rows[1]
+        assert rows[2]["result"]["id"] == "cp2"
+        assert "error" in rows[3]
+
+
+@pytest.mark.asyncio
+async def test_cli_batch_ordering(tmp_path, capsys):
+    status = "Charging"
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal status
+        path = request.url.path.split("/")
+        if path[-1] == "owned":
+            return httpx.Response(
+                200,
+                json=[
+                    {
+                        "id": cp,
+                        "name": cp,
+                        "password": "",
+                        "type": "Halo",
+                        "isLoadbalanced": False,
+                        "connectors": [],
+                    }
+                    for cp in ("cp1", "cp2")
+                ],
+            )
+        if path[-1] == "remotestop":
+            await asyncio.sleep(0.05)
+            status = "Stopped"
+            return httpx.Response(200)
+        return httpx.Response(200, json={"id": path[-2], "status": status, "connectorStatuses": []})
+
+    commands = tmp_path / "commands.txt"
+    # first line targets the default chargepoint (cp1), the later lines must wait for it
+    commands.write_text(
+        "stop-connector --connector 1\nstatus --chargepoint cp1\nstatus --all\n"
+        "status --chargepoint cp2\n"
+    )
+    async with mock_client(handler) as client:
+        await command_batch(client, argparse.Namespace(file=str(commands)))
+    rows = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [row["line"] for row in rows] == [1, 2, 3, 3, 4]
+    assert [row["result"]["status"] for row in rows[1:]] == ["Stopped"] * 4
+
+
+@pytest.mark.asyncio
+async def test_cli_report_shared_state(tmp_path):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        charge_point_id = request.url.path.split("/")[-2]
+        await asyncio.sleep(0.01)
+        return httpx.Response(
+            200,
+            json=[
+                {
+                    "id": 1,
+                    "chargePointId": charge_point_id,
+                    "connectorId": 1,
+                    "sessionType": "RFID",
+                    "totalConsumptionKwh": 1.0,
+                    "startTime": "2025-01-01T10:00:00Z",
+                    "endTime": "2025-01-01T11:00:00Z",
+                }
+            ],
+        )
+
+    state = str(tmp_path / "state.json")
+    async with mock_client(handler) as client:
+        await asyncio.gather(
+            *(
+                command_report(
+                    client,
+                    argparse.Namespace(
+                        state=state,
+                        sync=True,
+                        charge_point_id=cp,
+                        connector_id=None,
+                        period="day",
+                    ),
+                )
+                for cp in ("cp1", "cp2")
+            )
+        )
+        args = argparse.Namespace(
+            state=state, sync=False, charge_point_id=None, connector_id=None, period="day"
+        )
+        rows = await command_report(client, args)
+    assert [row["chargePointId"] for row in rows] == ["cp1", "cp2"]
+
+
+@pytest.mark.asyncio
+async def test_cli_batch_report(tmp_path, capsys):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        path = request.url.path.split("/")
+        if path[-1] == "owned":
+            return httpx.Response(
+                200,
+                json=[
+                    {
+                        "id": cp,
+                        "name": cp,
+                        "password": "",
+                        "type": "Halo",
+                        "isLoadbalanced": False,
+                        "connectors": [],
+                    }
+                    for cp in ("cp1", "cp2")
+                ],
+            )
+        return httpx.Response(
+            200,
+            json=[
+                {
+                    "id": 1,
+                    "chargePointId": path[-2],
+                    "connectorId": 1,
+                    "sessionType": "RFID",
+                    "totalConsumptionKwh": 1.0,
+                    "startTime": "2025-01-01T10:00:00Z",
+                    "endTime": "2025-01-01T11:00:00Z",
+                }
+            ],
+        )
+
+    commands = tmp_path / "commands.txt"
+    commands.write_text(f"report --state {tmp_path / 'state.json'}\n")
+    async with mock_client(handler) as client:
+        await command_batch(client, argparse.Namespace(file=str(commands)))
+    [row] = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [r["chargePointId"] for r in row["result"]] == ["cp1", "cp2"]
+
+
+@pytest.mark.asyncio
+async def test_cli_all_chargepoints():
+    async def handler(request: httpx.Request) -> httpx.Response:
+        path = request.url.path.split("/")
+        if path[-1] == "owned":
+            return httpx.Response(
+                200,
+                json=[
+                    {
+                        "id": cp,
+                        "name": cp,
+                        "password": "",
+                        "type": "Halo",
+                        "isLoadbalanced": False,
+                        "connectors": [],
+                    }
+                    for cp in ("cp1", "cp2", "cp3")
+                ],
+            )
+        if path[-4] == "cp1":
+            return httpx.Response(404)
+        return httpx.Response(
+            200,
+            json={
+                "chargePointId": path[-4],
+                "connectorId": int(path[-2]),
+                "mode": "On",
+                "rfidLock": False,
+                "cableLock": False,
+            },
+        )
+
+    async with mock_client(handler) as client:
+        args = argparse.Namespace(all=True, connector_id=1)
+        rows = [row async for row in await command_get_connector_settings(client, args)]
+        rows = sorted(rows, key=lambda row: row["chargePointId"])
+        assert [row["chargePointId"] for row in rows] == ["cp1", "cp2", "cp3"]
+        assert "error" in rows[0]
+        assert rows[1]["mode"] == "On"
+
+
+@pytest.mark.asyncio
+async def test_fingerprint_cache():
+    dimmer = "Off"
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"id": CHARGE_POINT_ID, "dimmer": dimmer})
+
+    async with mock_client(handler, fingerprint_cache=True) as client:
+        first, changed = await client.poll_chargepoint_settings(CHARGE_POINT_ID)
+        assert changed
+        second, changed = await client.poll_chargepoint_settings(CHARGE_POINT_ID)
+        assert not changed
+        assert second is first
+        dimmer = "High"
+        third, changed = await client.poll_chargepoint_settings(CHARGE_POINT_ID)
+        assert changed
+        assert third.dimmer == "High"
+
+
+@pytest.mark.asyncio
+async def test_get_chargingsessions():
+    requests = []
+
+    def session(charge_point_id: str, session_id: int) -> dict:
+        return {
+            "id": session_id,
+            "chargePointId": charge_point_id,
+            "connectorId": 1,
+            "sessionType": "RFID",
+            "totalConsumptionKwh": 1.0,
+        }
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url.path)
+        path = request.url.path.split("/")
+        if path[-1] == "chargingsessions":
+            if path[-2] == "cp2":
+                return httpx.Response(200, json=[{"id": "invalid"}])
+            return httpx.Response(200, json=[session(path[-2], i) for i in range(5)])
+        if path[-1] == "404":
+            return httpx.Response(404)
+        return httpx.Response(200, json=session(path[-3], int(path[-1])))
+
+    wanted = [("cp1", 1), ("cp2", 7), ("cp1", 2), ("cp1", 1), ("cp2", 404), ("cp1", 9)]
+    async with mock_client(handler) as client:
+        # no window given, all sessions are fetched individually
+        res = await client.get_chargingsessions(wanted, window_threshold=2)
+        assert [r.id for r in res if not isinstance(r, Exception)] == [1, 7, 2, 1, 9]
+        assert isinstance(res[4], httpx.HTTPStatusError)
+        assert sorted(path.split("/")[-1] for path in requests) == ["1", "2", "404", "7", "9"]
+
+        requests.clear()
+        res = await client.get_chargingsessions(
+            wanted, start_time=datetime(2025, 1, 1), window_threshold=2
+        )
+        assert [r.id for r in res if not isinstance(r, Exception)] == [1, 7, 2, 1, 9]
+        assert isinstance(res[4], httpx.HTTPStatusError)
+        # window fetch for both, invalid cp2 window falls back to individual fetches
+        assert sorted(path.split("/")[-1] for path in requests) == [
+            "404",
+            "7",
+            "9",
+            "chargingsessions",
+            "chargingsessions",
+        ]
+
+
+@pytest.mark.asyncio
+async def test_context_manager_warmup():
+    requests = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.method)
+        if request.method == "HEAD":
+            return httpx.Response(404)
+        return httpx.Response(
+            200,
+            json=[
+                {
+                    "id": CHARGE_POINT_ID,
+                    "name": "Garage",
+                    "password": "",
+                    "type": "Halo",
+                    "isLoadbalanced": False,
+                    "connectors": [],
+                }
+            ],
+        )
+
+    async with mock_client(handler) as client:
+        chargepoints = await client.warmup(connections=3)
+        assert await client.get_chargepoints(cached=True) is chargepoints
+    assert sorted(requests) == ["GET", "HEAD", "HEAD"]
+
+    # warmup connections are limited to the NORMAL budget
+    requests.clear()
+    async with mock_client(handler, scheduler=RequestScheduler({Priority.NORMAL: 2})) as client:
+        await client.warmup(connections=100)
+    assert sorted(requests) == ["GET", "HEAD"]
+
+    async with ChargeAmpsExternalClient(
+        email="user@example.com", password="mekmitasdigoat", api_key="xyzzy"
+    ) as client:
+        pass
+    assert client._httpx_client.is_closed
+
+
+def test_cli_all_conflicts():
+    parser = build_parser(BatchArgumentParser)
+    assert parse_args(parser, ["status", "--all"]).all
+    with pytest.raises(ValueError, match="not allowed"):
+        parse_args(parser, ["status", "--all", "--chargepoint", "cp1"])
+    with pytest.raises(ValueError, match="not allowed"):
+        parse_args(parser, ["sessions", "--all", "--session", "1"])
@@ -0,0 +1,45 @@
+from datetime import datetime
+
+from chargeamps.models import ChargingSession
+from chargeamps.report import EnergyAggregator
+
+
+def session(id: int, kwh: float, start: str, end: str | None = None) -> ChargingSession:
+    return ChargingSession(
+        id=id,
+        charge_point_id="cp1",
+        connector_id=1,
+        session_type="RFID",
+        total_consumption_kwh=kwh,
+        start_time=datetime.fromisoformat(start),
+        end_time=datetime.fromisoformat(end) if end else None,
+    )
+
+
+def test_incremental_rollups(tmp_path):
+    aggregator = EnergyAggregator()
+    assert aggregator.update([session(1, 5.0, "2025-01-01T10:00:00")]) == 1
+    assert aggregator.sync_start("cp1") == datetime.fromisoformat("2025-01-01T10:00:00Z")
+
+    # open session closes, new session arrives
+    sessions = [
+        session(1, 7.5, "2025-01-01T10:00:00", "2025-01-01T11:00:00"),
+        session(2, 2.5, "2025-01-01T12:30:00", "2025-01-01T13:00:00"),
+    ]
+    assert aggregator.update(sessions) == 2
+    assert aggregator.update(sessions) == 0
+    # only the session at the sync start is kept, session 1 is pruned but not recounted
+    assert list(aggregator._state.sessions) == ["cp1/2"]
+
+    [day] = aggregator.report("day")
+    assert day["period"] == "2025-01-01"
+    assert day["totalConsumptionKwh"] == 10.0
+    assert day["sessions"] == 2
+    assert day["durationSeconds"] == 5400
+    assert len(aggregator.report("hour")) == 2
+
+    state = tmp_path / "state.json"
+    aggregator.save(str(state))
+    loaded = EnergyAggregator.load(str(state))
+    assert loaded.report("month") == aggregator.report("month")
+    assert loaded.sync_start("cp1") == datetime.fromisoformat("2025-01-01T12:30:00Z")